@@ -1,29 +1,86 @@
 # main.py
-from fastapi import FastAPI, HTTPException
+# Requires FastAPI, httpx and python-dotenv; serve with uvicorn[standard]:
+#   python -m pip install fastapi httpx python-dotenv "uvicorn[standard]"
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
+from types import MappingProxyType
 from typing import Optional
+import hashlib
 import os
-import requests
-from requests import Response
+import time
+import httpx
 
 # Load credentials from .env
 load_dotenv()
 
-app = FastAPI(title="Uber FastAPI Bridge", version="1.0")
-
 # Environment variables
 UBER_ACCESS_TOKEN = os.getenv("UBER_ACCESS_TOKEN")
 UBER_BASE_URL = os.getenv("UBER_BASE_URL", "https://sandbox-api.uber.com/v1.2")
 
+# Headers for Uber API, built once at import (read-only, shared by all requests)
+_UBER_HEADERS = MappingProxyType({
+    "Authorization": f"Bearer {UBER_ACCESS_TOKEN}",
+    "Content-Type": "application/json"
+}) if UBER_ACCESS_TOKEN else None
+
 # Utility: Headers for Uber API
 def uber_headers():
-    if not UBER_ACCESS_TOKEN:
+    if _UBER_HEADERS is None:
         raise HTTPException(status_code=500, detail="Missing Uber access token in environment.")
-    return {
-        "Authorization": f"Bearer {UBER_ACCESS_TOKEN}",
-        "Content-Type": "application/json"
-    }
+    return _UBER_HEADERS
+
+# Shared async client: one connection pool for the lifetime of the app
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Missing token is reported per request by uber_client(), not at startup
+    app.state.uber = httpx.AsyncClient(
+        base_url=UBER_BASE_URL,
+        headers=_UBER_HEADERS or {},
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+    try:
+        yield
+    finally:
+        await app.state.uber.aclose()
+
+
+app = FastAPI(title="Uber FastAPI Bridge", version="1.0", lifespan=lifespan)
+
+
+def uber_client(request: Request) -> httpx.AsyncClient:
+    uber_headers()  # raises if the token is missing
+    return request.app.state.uber
+
+
+# Utility: conditional GET support
+def etag_for(body: bytes) -> str:
+    return f'W/"{hashlib.md5(body).hexdigest()}"'
+
+
+def cached_response(request: Request, body: bytes, etag: str, max_age: int) -> Response:
+    headers = {"ETag": etag, "Cache-Control": f"max-age={max_age}"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison: ignore W/ prefixes on either side
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or etag.removeprefix("W/") in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Root body never changes, so its ETag is computed once
+_ROOT_BODY = JSONResponse({"message": "✅ Uber FastAPI Bridge is running"}).body
+_ROOT_ETAG = etag_for(_ROOT_BODY)
+
+# /products responses keyed by rounded (lat, lon) -> (etag, body, expires_at)
+PRODUCTS_TTL = 30
+PRODUCTS_CACHE_SIZE = 256
+_products_cache: "OrderedDict[tuple[float, float], tuple[str, bytes, float]]" = OrderedDict()
 
 # Data model for ride requests
 class RideRequest(BaseModel):
@@ -35,24 +92,37 @@ class RideRequest(BaseModel):
 
 
 @app.get("/")
-def root():
-    return {"message": "✅ Uber FastAPI Bridge is running"}
+async def root(request: Request):
+    return cached_response(request, _ROOT_BODY, _ROOT_ETAG, max_age=60)
 
 
 @app.get("/products")
-def list_products(lat: float, lon: float):
+async def list_products(request: Request, lat: float, lon: float):
     """
     Lists available Uber ride products at a given location.
+    Results are cached for PRODUCTS_TTL seconds per location (~11 m grid).
     """
-    url = f"{UBER_BASE_URL}/products?latitude={lat}&longitude={lon}"
-    response = requests.get(url, headers=uber_headers())
-    if response.status_code >= 400:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
-    return response.json()
+    client = uber_client(request)
+    key = (round(lat, 4), round(lon, 4))
+    now = time.monotonic()
+    entry = _products_cache.get(key)
+    if entry is None or entry[2] <= now:
+        response = await client.get("/products", params={"latitude": key[0], "longitude": key[1]})
+        if response.status_code >= 400:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
+        body = response.content
+        entry = (etag_for(body), body, now + PRODUCTS_TTL)
+        _products_cache[key] = entry
+        if len(_products_cache) > PRODUCTS_CACHE_SIZE:
+            _products_cache.popitem(last=False)
+    _products_cache.move_to_end(key)
+
+    etag, body, expires_at = entry
+    return cached_response(request, body, etag, max_age=max(0, int(expires_at - now)))
 
 
 @app.post("/request_ride")
-def request_ride(ride: RideRequest):
+async def request_ride(request: Request, ride: RideRequest):
     """
     Request a ride from Uber API (Sandbox or Production).
     """
@@ -67,8 +137,7 @@ def request_ride(ride: RideRequest):
         "end_longitude": ride.end_longitude
     }
 
-    url = f"{UBER_BASE_URL}/requests"
-    response = requests.post(url, headers=uber_headers(), json=payload)
+    response = await uber_client(request).post("/requests", json=payload)
 
     if response.status_code >= 400:
         raise HTTPException(status_code=response.status_code, detail=response.text)
@@ -76,7 +145,7 @@ def request_ride(ride: RideRequest):
 
 
 @app.post("/request_ride_sandbox")
-def request_ride_sandbox(ride: RideRequest):
+async def request_ride_sandbox(request: Request, ride: RideRequest):
     """
     Create a sandbox ride request and immediately advance it to `accepted`.
     This uses the Uber Sandbox endpoints so no real ride is created.
@@ -93,9 +162,9 @@ def request_ride_sandbox(ride: RideRequest):
     }
 
     # Step 1: Create the sandbox request
-    create_url = f"{UBER_BASE_URL}/requests"
+    client = uber_client(request)
     try:
-        create_resp: Response = requests.post(create_url, headers=uber_headers(), json=payload)
+        create_resp: httpx.Response = await client.post("/requests", json=payload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to contact Uber API: {e}")
 
@@ -110,9 +179,8 @@ def request_ride_sandbox(ride: RideRequest):
         return {"created": create_data}
 
     # Step 2: Advance the sandbox request to 'accepted'
-    sandbox_url = f"{UBER_BASE_URL}/sandbox/requests/{request_id}"
     try:
-        sandbox_resp = requests.put(sandbox_url, headers=uber_headers(), json={"status": "accepted"})
+        sandbox_resp = await client.put(f"/sandbox/requests/{request_id}", json={"status": "accepted"})
     except Exception as e:
         # Return created request but indicate the sandbox advance failed
         return {"created": create_data, "sandbox_advance_error": str(e)}
@@ -125,12 +193,11 @@ def request_ride_sandbox(ride: RideRequest):
 
 
 @app.get("/ride_status/{request_id}")
-def ride_status(request_id: str):
+async def ride_status(request: Request, request_id: str):
     """
     Check the status of an existing Uber ride request.
     """
-    url = f"{UBER_BASE_URL}/requests/{request_id}"
-    response = requests.get(url, headers=uber_headers())
+    response = await uber_client(request).get(f"/requests/{request_id}")
     if response.status_code >= 400:
         raise HTTPException(status_code=response.status_code, detail=response.text)
     return response.json()
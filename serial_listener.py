@@ -18,12 +18,19 @@ this script.
 This script requires pyserial:
   python -m pip install pyserial
 
+Outside Windows it also requires pyserial-asyncio:
+  python -m pip install pyserial-asyncio
+
+The server is launched with httptools (and uvloop outside Windows), which
+ship with uvicorn's standard extras:
+  python -m pip install "uvicorn[standard]"
+
 """
 
 from __future__ import annotations
 import sys
 import os
-import time
+import asyncio
 import re
 import json
 import argparse
@@ -36,16 +43,126 @@ from typing import Optional
 try:
     import serial
     import serial.tools.list_ports
+    import serial.threaded
 except Exception as e:
     print("Missing dependency 'pyserial'. Install it with: python -m pip install pyserial")
     raise
 
+# Optional faster event loop (not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
 PID_FILE = os.path.join(PROJECT_DIR, "uvicorn.pid")
 
 # Windows creation flag to detach process: DETACHED_PROCESS
 DETACHED_PROCESS = 0x00000008
 
+# Pid of the server we know about; cleared when it is stopped or found dead
+_server_pid: Optional[int] = None
+
+# BAC line patterns, compiled once for the serial read loop.
+# Accept formats like: "BAC:0.082", "Estimated BAC: 0.082", "BAC: 0.082%", or just a number.
+_BAC_RE = re.compile(r"\bBAC\b[:\s]*([0-9]*\.?[0-9]+)", re.IGNORECASE)
+_FLOAT_RE = re.compile(r"([0-9]*\.?[0-9]+)")
+
+
+def parse_bac(line: str) -> Optional[float]:
+    """Extract a BAC value from a serial line, or None if the line has none."""
+    val = None
+    # Fast path for the sketch's standard "BAC:0.082" lines. Only plain
+    # decimals qualify; float() would also accept inf/nan, signs, exponents
+    # and underscores, which the regexes below do not.
+    if line[:4].upper() == "BAC:":
+        payload = line[4:].strip().rstrip('%')
+        if payload.isascii() and payload.replace('.', '', 1).isdigit():
+            val = float(payload)
+
+    if val is None:
+        m = _BAC_RE.search(line)
+        if m:
+            try:
+                val = float(m.group(1))
+            except Exception:
+                val = None
+        else:
+            # try any standalone float in the line as fallback
+            m2 = _FLOAT_RE.search(line)
+            if m2:
+                try:
+                    val = float(m2.group(1))
+                except Exception:
+                    val = None
+
+    if val is not None:
+        # If the value looks like a percentage > 1 (e.g., 8.2), normalize if needed
+        if val > 1.0:
+            # Likely a percent like 8.2 -> convert to 0.082
+            if val > 100.0:
+                # improbable large value, keep as-is
+                pass
+            else:
+                val = val / 100.0
+    return val
+
+
+class LineProtocol(asyncio.Protocol):
+    """Splits incoming serial bytes into lines and hands each batch to a callback."""
+
+    def __init__(self, on_lines, closed: asyncio.Future):
+        self.on_lines = on_lines
+        self.closed = closed
+        self.buffer = bytearray()
+
+    def data_received(self, data: bytes) -> None:
+        # One call may hold several lines; keep the trailing partial line for the next read
+        self.buffer.extend(data)
+        if b"\n" not in data:
+            return
+        *lines, rest = self.buffer.split(b"\n")
+        self.buffer = bytearray(rest)
+        self.on_lines([raw.decode("utf-8", errors="ignore") for raw in lines])
+
+    def connection_lost(self, exc) -> None:
+        if exc:
+            print("Serial read error:", exc)
+        if not self.closed.done():
+            self.closed.set_result(None)
+
+
+class ThreadedSerialBridge(serial.threaded.Protocol):
+    """Forwards bytes from a blocking ReaderThread to an asyncio protocol on the loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, protocol: asyncio.Protocol):
+        self.loop = loop
+        self.protocol = protocol
+
+    def data_received(self, data: bytes) -> None:
+        self.loop.call_soon_threadsafe(self.protocol.data_received, data)
+
+    def connection_lost(self, exc) -> None:
+        self.loop.call_soon_threadsafe(self.protocol.connection_lost, exc)
+
+
+async def open_serial_connection(loop: asyncio.AbstractEventLoop, protocol_factory, com_port: str, baudrate: int):
+    """Open the serial port and return (transport, protocol); transport.close() stops reading."""
+    if os.name == 'nt':
+        # pyserial-asyncio polls the port on a 0.5 ms timer on Windows, so read
+        # from a blocking ReaderThread instead and hand the bytes to the loop
+        ser = serial.Serial(com_port, baudrate)
+        protocol = protocol_factory()
+        reader = serial.threaded.ReaderThread(ser, lambda: ThreadedSerialBridge(loop, protocol))
+        reader.start()
+        return reader, protocol
+    try:
+        import serial_asyncio
+    except Exception as e:
+        print("Missing dependency 'pyserial-asyncio'. Install it with: python -m pip install pyserial-asyncio")
+        raise
+    return await serial_asyncio.create_serial_connection(loop, protocol_factory, com_port, baudrate=baudrate)
+
 
 def find_arduino_port() -> Optional[str]:
     ports = list(serial.tools.list_ports.comports())
@@ -68,27 +185,45 @@ def get_python_executable() -> str:
 
 
 def is_server_running() -> bool:
-    if os.path.exists(PID_FILE):
-        try:
-            with open(PID_FILE, "r") as f:
-                pid = int(f.read().strip())
-            # check if process exists
-            os.kill(pid, 0)
-            return True
-        except Exception:
+    global _server_pid
+    try:
+        # Only touch the pid file when nothing is cached yet
+        if _server_pid is None:
+            fd = os.open(PID_FILE, os.O_RDONLY)
             try:
-                os.remove(PID_FILE)
-            except OSError:
-                pass
+                data = os.read(fd, 32)
+            finally:
+                os.close(fd)
+            _server_pid = int(data)
+        # check if process exists
+        os.kill(_server_pid, 0)
+        return True
+    except FileNotFoundError:
+        return False
+    except Exception:
+        _server_pid = None
+        try:
+            os.remove(PID_FILE)
+        except OSError:
+            pass
     return False
 
 
-def start_server() -> Optional[int]:
+def start_server(reload: bool = False) -> Optional[int]:
+    global _server_pid
     if is_server_running():
         print("Server already running (pid file exists).")
         return None
     python = get_python_executable()
-    cmd = [python, "-m", "uvicorn", "main:app", "--reload"]
+    cmd = [python, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", "8000", "--http", "httptools"]
+    # uvloop is not available on Windows
+    if os.name != 'nt':
+        cmd += ["--loop", "uvloop"]
+    # The file-watching reloader is for development only
+    if reload:
+        cmd += ["--reload"]
+    else:
+        cmd += ["--workers", "1"]
     print("Starting server with:", cmd)
     try:
         # Start detached so it keeps running after this script continues
@@ -96,6 +231,7 @@ def start_server() -> Optional[int]:
         pid = proc.pid
         with open(PID_FILE, "w") as f:
             f.write(str(pid))
+        _server_pid = pid
         print(f"Server started (pid={pid}).")
         return pid
     except Exception as e:
@@ -104,6 +240,8 @@ def start_server() -> Optional[int]:
 
 
 def stop_server() -> bool:
+    global _server_pid
+    _server_pid = None
     if not os.path.exists(PID_FILE):
         print("No pid file, server may not be running.")
         return False
@@ -143,7 +281,15 @@ def list_ports():
         print(f"  {p.device} - {p.description}")
 
 
-def main():
+def install_event_loop_policy() -> None:
+    # Proactor loop on Windows (serial reads use a ReaderThread there); uvloop elsewhere when installed
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    elif uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", "-p", help="Serial port (e.g. COM3). If omitted the script will try to auto-detect.")
     parser.add_argument("--baud", "-b", type=int, default=9600, help="Baud rate (default 9600)")
@@ -154,6 +300,9 @@ def main():
     parser.add_argument("--consecutive-stop", type=int, default=3, help="Number of consecutive BAC readings < threshold required to stop when --auto-stop is enabled (default 3)")
     parser.add_argument("--calibration-file", default="bac_calibration.json", help="Path to JSON calibration file (optional)")
     parser.add_argument("--log-file", default="logs/serial_listener.log", help="Path to log file")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help="Logging level; DEBUG also logs every serial line and parsed BAC reading (default INFO)")
+    parser.add_argument("--reload", action="store_true", help="Start the server with uvicorn --reload (development only)")
     args = parser.parse_args()
 
     com_port = args.port or find_arduino_port()
@@ -165,13 +314,6 @@ def main():
 
     print(f"Using serial port: {com_port} @ {args.baud}")
 
-    try:
-        ser = serial.Serial(com_port, args.baud, timeout=1)
-    except Exception as e:
-        print("Failed to open serial port:", e)
-        list_ports()
-        return
-
     server_pid = None
     started_by_bac = False
     above_count = 0
@@ -180,7 +322,7 @@ def main():
     # Prepare logging
     log_path = Path(args.log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s', handlers=[
+    logging.basicConfig(level=getattr(logging, args.log_level), format='%(asctime)s %(levelname)s: %(message)s', handlers=[
         logging.FileHandler(log_path, encoding='utf-8'),
         logging.StreamHandler(sys.stdout)
     ])
@@ -199,117 +341,114 @@ def main():
     else:
         logging.info("No calibration file found; using default mapping")
 
+    # Default mapping (legacy): map 0..1023 to 0..0.5
+    scale, offset = 0.5 / 1023.0, 0.0
+    # If calibration is a dict with 'scale' and optional 'offset' use it.
+    # Resolved once here so the per-sample mapping is a plain multiply-add.
+    if calibration and isinstance(calibration, dict):
+        try:
+            scale = float(calibration.get('scale', 0.5/1023.0))
+            offset = float(calibration.get('offset', 0.0))
+        except Exception:
+            scale, offset = 0.5 / 1023.0, 0.0
+
     def calibrated_bac_from_analog(analog_val: int) -> float:
-        # If calibration is a dict with 'scale' and optional 'offset' use it
-        if calibration and isinstance(calibration, dict):
-            try:
-                scale = float(calibration.get('scale', 0.5/1023.0))
-                offset = float(calibration.get('offset', 0.0))
-                return analog_val * scale + offset
-            except Exception:
-                pass
-        # Default mapping (legacy): map 0..1023 to 0..0.5
-        return float(analog_val) * (0.5 / 1023.0)
-    print("Listening for serial commands (START / STOP). Ctrl-C to quit.")
+        return analog_val * scale + offset
+
+    # Hoist option lookups out of the per-line loop
+    bac_threshold = args.bac_threshold
+    consecutive = args.consecutive
+    consecutive_stop = args.consecutive_stop
+    no_auto_start = args.no_auto_start
+    auto_stop = args.auto_stop
+    reload = args.reload
+
+    def handle_command(cmd: str) -> None:
+        nonlocal started_by_bac
+        if cmd == "START":
+            if no_auto_start:
+                print("(no-auto-start) Received START")
+            else:
+                start_server(reload)
+                started_by_bac = False
+        else:
+            stop_server()
+            started_by_bac = False
+
+    def handle_bac(val: float) -> None:
+        nonlocal started_by_bac, above_count, below_count
+        # Per-sample record; DEBUG so the INFO console/file handlers skip it
+        logging.debug("Parsed BAC=%.3f (threshold=%s)", val, bac_threshold)
+        # trigger start when threshold met, using consecutive reading debounce.
+        # Each counter grows on its side of the threshold and resets to 0 on the other.
+        above = val >= bac_threshold
+        above_count = (above_count + 1) * above
+        below_count = (below_count + 1) * (not above)
+
+        logging.debug("consecutive above=%d below=%d", above_count, below_count)
+
+        if above_count >= consecutive:
+            if not is_server_running():
+                if no_auto_start:
+                    logging.info("(no-auto-start) Detected BAC>=threshold, not starting server")
+                else:
+                    p = start_server(reload)
+                    if p:
+                        started_by_bac = True
+                        logging.info(f"Started server due to BAC threshold (pid={p})")
+            else:
+                logging.info("Server already running; BAC threshold detected")
 
-    try:
-        while True:
-            try:
-                raw = ser.readline()
-            except Exception as e:
-                print("Serial read error:", e)
-                time.sleep(0.5)
-                continue
-            if not raw:
-                time.sleep(0.05)
-                continue
-            try:
-                line = raw.decode("utf-8", errors="ignore").strip()
-            except Exception:
-                line = str(raw)
+        if auto_stop and started_by_bac and below_count >= consecutive_stop:
+            if is_server_running():
+                logging.info("BAC dropped below threshold and --auto-stop enabled: stopping server")
+                stop_server()
+                started_by_bac = False
+
+    def handle_lines(lines: list[str]) -> None:
+        for line in lines:
+            line = line.strip()
             if not line:
                 continue
-            print("Serial->", line)
-            cmd = line.strip()
+            logging.debug("Serial-> %s", line)
+            cmd = line.upper()
 
             # If the Arduino sends a simple START or STOP command, handle it first
-            if cmd.upper() == "START":
-                if args.no_auto_start:
-                    print("(no-auto-start) Received START")
-                else:
-                    start_server()
-                    started_by_bac = False
-                continue
-            if cmd.upper() == "STOP":
-                stop_server()
-                started_by_bac = False
+            if cmd == "START" or cmd == "STOP":
+                handle_command(cmd)
                 continue
 
-            # Try to parse a BAC value from the line.
-            # Accept formats like: "BAC:0.082", "Estimated BAC: 0.082", "BAC: 0.082%", or just a number.
-            m = re.search(r"\bBAC\b[:\s]*([0-9]*\.?[0-9]+)", line, flags=re.IGNORECASE)
-            val = None
-            if m:
-                try:
-                    val = float(m.group(1))
-                except Exception:
-                    val = None
+            # Every BAC reading counts, regardless of how reads were chunked
+            val = parse_bac(line)
+            if val is not None:
+                handle_bac(val)
             else:
-                # try any standalone float in the line as fallback
-                m2 = re.search(r"([0-9]*\.?[0-9]+)", line)
-                if m2:
-                    try:
-                        val = float(m2.group(1))
-                    except Exception:
-                        val = None
+                logging.debug("Unrecognized serial command. Use START, STOP or send 'BAC:<value>' lines.")
 
-            if val is not None:
-                # If the value looks like a percentage > 1 (e.g., 8.2), normalize if needed
-                if val > 1.0:
-                    # Likely a percent like 8.2 -> convert to 0.082
-                    if val > 100.0:
-                        # improbable large value, keep as-is
-                        pass
-                    else:
-                        val = val / 100.0
-                logging.info(f"Parsed BAC={val:.3f} (threshold={args.bac_threshold})")
-                # trigger start when threshold met, using consecutive reading debounce
-                if val >= args.bac_threshold:
-                    above_count += 1
-                    below_count = 0
-                else:
-                    below_count += 1
-                    above_count = 0
-
-                logging.debug(f"consecutive above={above_count} below={below_count}")
-
-                if above_count >= args.consecutive:
-                    if not is_server_running():
-                        if args.no_auto_start:
-                            logging.info("(no-auto-start) Detected BAC>=threshold, not starting server")
-                        else:
-                            p = start_server()
-                            if p:
-                                started_by_bac = True
-                                logging.info(f"Started server due to BAC threshold (pid={p})")
-                    else:
-                        logging.info("Server already running; BAC threshold detected")
-
-                if args.auto_stop and started_by_bac and below_count >= args.consecutive_stop:
-                    if is_server_running():
-                        logging.info("BAC dropped below threshold and --auto-stop enabled: stopping server")
-                        stop_server()
-                        started_by_bac = False
-                continue
+    loop = asyncio.get_running_loop()
+    closed = loop.create_future()
+    try:
+        transport, _ = await open_serial_connection(
+            loop, lambda: LineProtocol(handle_lines, closed), com_port, args.baud)
+    except ImportError:
+        raise
+    except Exception as e:
+        print("Failed to open serial port:", e)
+        list_ports()
+        return
 
-            # If we get here, line didn't match START/STOP/BAC
-            print("Unrecognized serial command. Use START, STOP or send 'BAC:<value>' lines.")
-    except KeyboardInterrupt:
-        print("Exiting: closing serial port")
+    print("Listening for serial commands (START / STOP). Ctrl-C to quit.")
+    try:
+        # Lines are handled by the protocol as they arrive; wait until the port closes
+        await closed
     finally:
-        if ser and ser.is_open:
-            ser.close()
+        print("Exiting: closing serial port")
+        transport.close()
 
 
 if __name__ == "__main__":
-    main()
+    install_event_loop_policy()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass